@@ -22,6 +22,11 @@ celery_app.conf.update(
     task_acks_late=True,
     task_reject_on_worker_lost=True,
     worker_prefetch_multiplier=1,
+    task_routes={
+        "src.tasks.accounts.send_email_task": {"queue": "email_queue"},
+        "src.tasks.accounts.send_email_batch": {"queue": "email_queue"},
+        "src.tasks.accounts.clean_expired_tokens": {"queue": "maintenance_queue"},
+    },
     task_track_started=True,
     beat_schedule=CELERY_BEAT_SCHEDULE
 )
\ No newline at end of file
@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 
 from fastapi import Depends
 
@@ -7,13 +8,15 @@ from src.security.interfaces import JWTAuthManagerInterface
 from src.security.token_manager import JWTAuthManager
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """
     Retrieve the application settings based on the current environment.
 
     This function reads the 'ENVIRONMENT' environment variable (defaulting to 'developing' if not set)
     and returns a corresponding settings instance. If the environment is 'testing', it returns an instance
-    of TestingSettings; otherwise, it returns an instance of Settings.
+    of TestingSettings; otherwise, it returns an instance of Settings. The instance is built once
+    per process and reused, so environment parsing and validation do not run on every request.
 
     Returns:
         BaseAppSettings: The settings instance appropriate for the current environment.
@@ -10,7 +10,7 @@ from sqlalchemy import (
     Boolean,
     DateTime,
     func,
-    ForeignKey, Date, Text, UniqueConstraint
+    ForeignKey, Date, Text, UniqueConstraint, Index
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
@@ -337,6 +337,8 @@ class RefreshTokenModel(TokenBaseModel):
         default=generate_secure_token
     )
 
+    __table_args__ = (Index("ix_refresh_tokens_expires_at", "expires_at"),)
+
     @classmethod
     def create(
             cls,
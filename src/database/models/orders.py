@@ -34,7 +34,6 @@ class Orders(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
-        default=datetime.now(),
         server_default=func.now()
     )
     status: Mapped[str] = mapped_column(
@@ -38,7 +38,6 @@ class Payment(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
-        default=datetime.now,
         server_default=func.now()
     )
     status: Mapped[str] = mapped_column(
@@ -3,9 +3,10 @@ from typing import AsyncGenerator
 import os
 import logging
 
-from sqlalchemy import select
+from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from src.config.settings import get_settings
 from src.database import UserGroupModel, UserGroupEnum
 from src.database.models.base import Base
@@ -24,7 +25,29 @@ db_dir = os.path.dirname(settings.PATH_TO_DB)
 if db_dir:
     os.makedirs(db_dir, exist_ok=True)
 
-engine = create_async_engine(DATABASE_URL, echo=False)
+if settings.PATH_TO_DB == ":memory:":
+    # A single shared connection keeps the in-memory database alive for the whole process.
+    engine = create_async_engine(
+        DATABASE_URL,
+        echo=False,
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False}
+    )
+else:
+    engine = create_async_engine(DATABASE_URL, echo=False)
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _disable_driver_transactions(dbapi_connection, connection_record):
+    # Let SQLAlchemy emit BEGIN itself so that SAVEPOINTs work with the sqlite driver.
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine.sync_engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
 AsyncSQLiteSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False) #type: ignore
 
 
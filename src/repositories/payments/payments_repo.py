@@ -1,35 +1,84 @@
 from typing import Sequence, Optional
 
-from sqlalchemy import select
+from sqlalchemy import select, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from src.database.models.orders import Orders
 from src.database.models.payments import Payment, PaymentStatusEnum, PaymentItem
 from src.repositories.base import BaseRepository
 
 
+COPY_ITEMS_THRESHOLD = 50
+
+
 class PaymentsRepository(BaseRepository):
     def __init__(self, db: AsyncSession):
         super().__init__(db)
 
-    async def create_payment(self, payment: Payment) -> Payment:
+    async def create_payment(self, payment: Payment, items: Sequence[dict] = ()) -> Payment:
         self.db.add(payment)
+        if items:
+            await self.db.flush()
+            if len(items) >= COPY_ITEMS_THRESHOLD and self.db.get_bind().dialect.driver == "asyncpg":
+                await self._copy_payment_items(payment.id, items)
+            else:
+                await self.db.execute(
+                    insert(PaymentItem),
+                    [{"payment_id": payment.id, **item} for item in items]
+                )
         await self.db.commit()
         await self.db.refresh(payment)
         return payment
 
+    async def create_payments(self, payments: Sequence[Payment]) -> Sequence[Payment]:
+        """
+        Insert several payments at once and return them reloaded, ordered by id.
+
+        Like `create_payment`, this commits rather than only flushing, so the payments
+        are persisted when it returns. They are reloaded with one SELECT so that
+        server-generated columns are populated. Ids are assigned in insertion order,
+        so the result follows the order of `payments`.
+        """
+        self.db.add_all(payments)
+        await self.db.commit()
+        result = await self.db.execute(
+            select(Payment)
+            .where(Payment.id.in_([payment.id for payment in payments]))
+            .order_by(Payment.id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalars().all()
+
+    async def _copy_payment_items(self, payment_id: int, items: Sequence[dict]) -> None:
+        connection = await self.db.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            PaymentItem.__tablename__,
+            records=[
+                (payment_id, item["order_item_id"], item["price_at_payment"])
+                for item in items
+            ],
+            columns=["payment_id", "order_item_id", "price_at_payment"]
+        )
+
     async def update_payment(self, payment: Payment) -> Payment:
         await self.db.merge(payment)
         await self.db.commit()
         return payment
 
     async def update_payment_status(self, payment_id: int, status: PaymentStatusEnum) -> Payment:
-        payment = await self.db.get(Payment, payment_id)
+        stmt = (
+            update(Payment)
+            .where(Payment.id == payment_id)
+            .values(status=status)
+            .returning(Payment)
+            .execution_options(populate_existing=True)
+        )
+        payment = await self.db.scalar(stmt)
         if not payment:
             raise ValueError("Payment not found")
-        payment.status = status
         await self.db.commit()
-        await self.db.refresh(payment)
         return payment
 
     async def get_payment_by_id(self, payment_id: int) -> Optional[Payment]:
@@ -63,3 +112,11 @@ class PaymentsRepository(BaseRepository):
             select(Payment).where(Payment.order_id == order_id)
         )
         return result.scalars().all()
+
+    async def get_payments_by_order_id_if_owned(self, order_id: int, user_id: int) -> Sequence[Payment]:
+        result = await self.db.execute(
+            select(Payment)
+            .join(Orders, Payment.order_id == Orders.id)
+            .where(Orders.id == order_id, Orders.user_id == user_id)
+        )
+        return result.scalars().all()
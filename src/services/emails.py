@@ -1,4 +1,5 @@
 import logging
+from contextlib import asynccontextmanager
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import aiosmtplib
@@ -32,6 +33,7 @@ class EmailSenderService:
         self._activation_complete_email_template_name = activation_complete_email_template_name
         self._password_email_template_name = password_email_template_name
         self._password_complete_email_template_name = password_complete_email_template_name
+        self._smtp = None
 
         logger.info(
             f"Initializing EmailSenderService with hostname={hostname}, port={port}, email={email}, use_tls={use_tls}, template_dir={template_dir}")
@@ -43,6 +45,34 @@ class EmailSenderService:
             logger.error(f"Failed to initialize Jinja2 environment: {e}", exc_info=True)
             raise
 
+    async def _connect(self) -> aiosmtplib.SMTP:
+        """
+        Open an authenticated SMTP connection using the configured server settings.
+        """
+        smtp = aiosmtplib.SMTP(hostname=self._hostname, port=self._port, use_tls=self._use_tls)
+        logger.debug(f"Connecting to SMTP server {self._hostname}:{self._port} with use_tls={self._use_tls}")
+        await smtp.connect()
+        if self._use_tls:
+            logger.debug("Initiating STARTTLS for port 587")
+            await smtp.starttls()
+        logger.debug(f"Logging in with email {self._email}")
+        await smtp.login(self._email, self._password)
+        return smtp
+
+    @asynccontextmanager
+    async def batch(self):
+        """
+        Keep a single SMTP connection open for every email sent inside the block.
+
+        Emails sent outside of a batch open and close their own connection.
+        """
+        self._smtp = await self._connect()
+        try:
+            yield self
+        finally:
+            smtp, self._smtp = self._smtp, None
+            await smtp.quit()
+
     async def _send_email(self, recipient: str, subject: str, html_content: str) -> None:
         """
         Asynchronously send an email with the given subject and HTML content.
@@ -64,17 +94,11 @@ class EmailSenderService:
         message.attach(MIMEText(html_content, "html"))
 
         try:
-            smtp = aiosmtplib.SMTP(hostname=self._hostname, port=self._port, use_tls=self._use_tls)
-            logger.debug(f"Connecting to SMTP server {self._hostname}:{self._port} with use_tls={self._use_tls}")
-            await smtp.connect()
-            if self._use_tls:
-                logger.debug("Initiating STARTTLS for port 587")
-                await smtp.starttls()
-            logger.debug(f"Logging in with email {self._email}")
-            await smtp.login(self._email, self._password)
+            smtp = self._smtp or await self._connect()
             logger.debug(f"Sending email to {recipient}")
             await smtp.sendmail(self._email, [recipient], message.as_string())
-            await smtp.quit()
+            if smtp is not self._smtp:
+                await smtp.quit()
             logger.info(f"Successfully sent email to {recipient} with subject: {subject}")
         except aiosmtplib.SMTPException as error:
             logger.error(f"SMTP error sending email to {recipient}: {error}", exc_info=True)
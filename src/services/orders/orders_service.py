@@ -60,8 +60,7 @@ class OrdersService:
         order = Orders(
             user_id=user_id,
             total_amount=total_amount,
-            status=OrderStatusEnum.PENDING,
-            created_at=datetime.now()
+            status=OrderStatusEnum.PENDING
         )
         order.order_items = [
             OrderItems(
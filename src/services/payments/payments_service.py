@@ -1,11 +1,10 @@
-from datetime import datetime
 from decimal import Decimal
 from typing import Optional, Sequence
 
 from fastapi import HTTPException
 
 from src.database.models.orders import OrderStatusEnum
-from src.database.models.payments import Payment, PaymentStatusEnum, PaymentItem
+from src.database.models.payments import Payment, PaymentStatusEnum
 from src.providers.payment_provider import PaymentProviderInterface
 from src.repositories.cart.cart_rep import CartRepository
 from src.repositories.orders.order_repo import OrderRepository
@@ -54,19 +53,18 @@ class PaymentService:
             order_id=order_id,
             amount=order.total_amount,
             status=PaymentStatusEnum.PENDING,
-            external_payment_id=external_payment_id,
-            created_at=datetime.now()
+            external_payment_id=external_payment_id
         )
 
-        payment.payment_items = [
-            PaymentItem(
-                order_item_id=item.id,
-                price_at_payment=item.price_at_order
-            )
+        payment_items = [
+            {
+                "order_item_id": item.id,
+                "price_at_payment": item.price_at_order
+            }
             for item in order.order_items
         ]
 
-        await self.payment_repository.create_payment(payment)
+        await self.payment_repository.create_payment(payment, payment_items)
         return payment_url
 
     async def complete_payment(self, external_payment_id: str) -> Payment:
@@ -83,35 +81,25 @@ class PaymentService:
         payment_intent = await self.payment_provider.get_payment_intent(external_payment_id)
         
         if payment_intent["status"] == "processing":
-            payment.status = PaymentStatusEnum.PROCESSING
-            payment = await self.payment_repository.update_payment_status(payment.id, payment.status)
+            payment = await self.payment_repository.update_payment_status(payment.id, PaymentStatusEnum.PROCESSING)
             return payment
         elif payment_intent["status"] == "succeeded":
-            payment.status = PaymentStatusEnum.SUCCESSFUL
             await self.order_repository.update_order_status(payment.order_id, OrderStatusEnum.PAID)
-            payment = await self.payment_repository.update_payment_status(payment.id, payment.status)
+            payment = await self.payment_repository.update_payment_status(payment.id, PaymentStatusEnum.SUCCESSFUL)
             return payment
         elif payment_intent["status"] == "requires_payment_method" or payment_intent["status"] == "requires_confirmation":
-            payment.status = PaymentStatusEnum.PENDING
-            payment = await self.payment_repository.update_payment_status(payment.id, payment.status)
+            payment = await self.payment_repository.update_payment_status(payment.id, PaymentStatusEnum.PENDING)
             return payment
 
-        payment.status = PaymentStatusEnum.CANCELED
-        payment = await self.payment_repository.update_payment_status(payment.id, payment.status)
+        payment = await self.payment_repository.update_payment_status(payment.id, PaymentStatusEnum.CANCELED)
         return payment
 
     async def refund_payment(self, order_id: int, user_id: int, amount: Optional[Decimal] = None) -> Payment:
-        try:
-            order = await self.order_repository.get_order_by_id(order_id)
-        except OrderNotFoundError:
-            raise HTTPException(status_code=404, detail="Order not found")
-
-        if order.user_id != user_id:
-            raise HTTPException(status_code=403, detail="Not authorized")
-
         payment = await self.payment_repository.get_successful_payment_by_order_id(order_id)
         if not payment:
             raise HTTPException(status_code=404, detail="No successful payment found for this order")
+        if payment.user_id != user_id:
+            raise HTTPException(status_code=403, detail="Not authorized")
         if payment.status != PaymentStatusEnum.SUCCESSFUL:
             raise HTTPException(status_code=400, detail="Payment cannot be refunded")
 
@@ -121,8 +109,7 @@ class PaymentService:
 
         success = await self.payment_provider.refund_payment(payment.external_payment_id, amount)
         if success:
-            payment.status = PaymentStatusEnum.REFUNDED
-            payment = await self.payment_repository.update_payment_status(payment.id, payment.status)
+            payment = await self.payment_repository.update_payment_status(payment.id, PaymentStatusEnum.REFUNDED)
         else:
             raise HTTPException(status_code=400, detail="Refund failed in payment provider")
         
@@ -133,6 +120,10 @@ class PaymentService:
         return payments
 
     async def get_order_payments(self, order_id: int, user_id: int) -> Sequence[Payment]:
+        payments = await self.payment_repository.get_payments_by_order_id_if_owned(order_id, user_id)
+        if payments:
+            return payments
+
         try:
             order = await self.order_repository.get_order_by_id(order_id)
         except OrderNotFoundError:
@@ -141,5 +132,4 @@ class PaymentService:
         if order.user_id != user_id:
             raise HTTPException(status_code=403, detail="Not authorized")
 
-        payments = await self.payment_repository.get_payments_by_order_id(order_id)
         return payments
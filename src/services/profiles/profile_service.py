@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import uuid
 from pathlib import Path
@@ -33,9 +34,8 @@ class ProfileService:
             unique_filename = f"{uuid.uuid4()}.{file_extension}"
             file_path = self.upload_dir / unique_filename
             logger.debug(f"Saving uploaded file to: {file_path}")
-            with file_path.open("wb") as buffer:
-                content = await file.read()
-                buffer.write(content)
+            content = await file.read()
+            await asyncio.to_thread(file_path.write_bytes, content)
             return file_path.as_posix()
         except Exception as e:
             logger.error(f"Error saving uploaded file: {str(e)}")
@@ -1,44 +1,135 @@
-from datetime import datetime, timezone
 import logging
 import asyncio
+import time
+from functools import lru_cache
 
-from celery import shared_task
-from sqlalchemy import delete
+from celery import group, shared_task
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
 
 from src.config.settings import get_settings
-from src.database import get_db
 from src.database.models.accounts import RefreshTokenModel
 from src.services.emails import EmailSenderService
 
 logger = logging.getLogger(__name__)
 
+CLEANUP_BATCH_SIZE = 5000
+CLEANUP_TIME_BUDGET_SECONDS = 600
+EMAIL_BATCH_SIZE = 10
+
+
+async def _delete_expired_tokens(engine: AsyncEngine, batch_size: int, time_budget: float) -> int:
+    """
+    Delete expired refresh tokens in bounded batches, committing after each one.
+
+    Each batch selects its ids through the ix_refresh_tokens_expires_at index, so a run
+    costs time proportional to the expired rows rather than to the size of the table.
+    Stops after a short batch or once `time_budget` seconds have passed.
+    """
+    deadline = time.monotonic() + time_budget
+    deleted_total = 0
+    while True:
+        expired_ids = (
+            select(RefreshTokenModel.id)
+            .where(RefreshTokenModel.expires_at < func.now())
+            .limit(batch_size)
+        )
+        stmt = (
+            delete(RefreshTokenModel)
+            .where(RefreshTokenModel.id.in_(expired_ids))
+            .execution_options(synchronize_session=False)
+        )
+        async with engine.begin() as conn:
+            result = await conn.execute(stmt)
+        deleted_total += result.rowcount
+        if result.rowcount < batch_size or time.monotonic() >= deadline:
+            break
+    return deleted_total
+
+
+async def _clean_expired_tokens() -> int:
+    """
+    Run the batched cleanup against the configured database.
+
+    A dedicated engine without pooling is used because every task run executes
+    on a fresh event loop, and asyncpg connections cannot be shared across loops.
+    """
+    engine = create_async_engine(get_settings().DATABASE_URL, poolclass=NullPool)
+    try:
+        return await _delete_expired_tokens(
+            engine,
+            CLEANUP_BATCH_SIZE,
+            CLEANUP_TIME_BUDGET_SECONDS
+        )
+    finally:
+        await engine.dispose()
+
 
 @shared_task
-async def clean_expired_tokens():
-    """Periodically clean expired refresh tokens from the database."""
+def clean_expired_tokens():
+    """Periodically clean expired refresh tokens from the database in batches."""
     logger.info("Starting cleanup of expired refresh tokens")
     try:
-        async with get_db() as db:
-            async with db.begin():
-                stmt = delete(RefreshTokenModel).where(
-                    RefreshTokenModel.expires_at < datetime.now(timezone.utc)
-                )
-                result = await db.execute(stmt)
-                deleted_count = result.rowcount
-                logger.info(f"Deleted {deleted_count} expired tokens")
-    except asyncio.CancelledError:
-        logger.warning("Token cleanup task was cancelled")
-        raise
+        deleted_count = asyncio.run(_clean_expired_tokens())
+        logger.info("Deleted %d expired tokens", deleted_count)
     except Exception as e:
-        logger.error(
-            f"Error during cleanup of expired refresh tokens: {str(e)}",
-            exc_info=True
-        )
+        logger.error("Error during cleanup of expired refresh tokens: %s", e, exc_info=True)
         raise
 
 
+@lru_cache(maxsize=1)
+def _get_email_service() -> EmailSenderService:
+    """Build the email service once per worker process and reuse it across tasks."""
+    settings = get_settings()
+    return EmailSenderService(
+        hostname=settings.EMAIL_HOSTNAME,
+        port=settings.EMAIL_PORT,
+        email=settings.EMAIL_ADDRESS,
+        password=settings.EMAIL_PASSWORD,
+        use_tls=settings.EMAIL_USE_TLS,
+        template_dir=settings.EMAIL_TEMPLATE_DIR,
+        activation_email_template_name=settings.ACTIVATION_EMAIL_TEMPLATE,
+        activation_complete_email_template_name=settings.ACTIVATION_COMPLETE_EMAIL_TEMPLATE,
+        password_email_template_name=settings.PASSWORD_EMAIL_TEMPLATE,
+        password_complete_email_template_name=settings.PASSWORD_COMPLETE_EMAIL_TEMPLATE,
+    )
+
+
+_EMAIL_SENDERS = {
+    "activation": EmailSenderService.send_activation_email,
+    "activation_complete": EmailSenderService.send_activation_complete_email,
+    "password_reset": EmailSenderService.send_password_reset_email,
+    "password_reset_complete": EmailSenderService.send_password_reset_complete_email,
+}
+
+
+async def _send_email(
+        email_service: EmailSenderService,
+        email_type: str,
+        recipient: str,
+        link: str
+) -> None:
+    sender = _EMAIL_SENDERS.get(email_type)
+    if sender is None:
+        raise ValueError(f"Unknown email type: {email_type}")
+    await sender(email_service, recipient, link)
+
+
+async def _send_emails(items: list[dict], sent: list[dict]) -> None:
+    """
+    Send every item over one SMTP connection, appending each delivered item to `sent`.
+    """
+    email_service = _get_email_service()
+    async with email_service.batch():
+        for item in items:
+            await _send_email(email_service, item["email_type"], item["recipient"], item["link"])
+            sent.append(item)
+
+
 @shared_task(bind=True, max_retries=3, default_retry_delay=300)
-async def send_email_task(
+def send_email_task(
+        self,
         email_type: str,
         recipient: str,
         link: str
@@ -54,38 +145,56 @@ async def send_email_task(
         link (str): Activation or reset link.
     """
 
-    logger.info(f"Queuing {email_type} email for {recipient}")
+    logger.info("Sending %s email to %s", email_type, recipient)
     try:
-        settings = get_settings()
-        email_service = EmailSenderService(
-            hostname=settings.SMTP_HOST,
-            port=settings.SMTP_PORT,
-            email=settings.SMTP_EMAIL,
-            password=settings.SMTP_PASSWORD,
-            use_tls=settings.SMTP_USE_TLS,
-            template_dir=settings.TEMPLATE_DIR,
-            activation_email_template_name=settings.ACTIVATION_EMAIL_TEMPLATE_NAME,
-            activation_complete_email_template_name=settings.ACTIVATION_COMPLETE_EMAIL_TEMPLATE_NAME,
-            password_email_template_name=settings.PASSWORD_EMAIL_TEMPLATE_NAME,
-            password_complete_email_template_name=settings.PASSWORD_COMPLETE_EMAIL_TEMPLATE_NAME,
+        asyncio.run(_send_email(_get_email_service(), email_type, recipient, link))
+        logger.info("%s email sent successfully to %s", email_type, recipient)
+    except Exception as e:
+        logger.error(
+            "Failed to send %s email to %s: %s", email_type, recipient, e,
+            exc_info=self.request.retries >= self.max_retries
         )
+        raise self.retry(exc=e, countdown=60)
 
-        try:
-            if email_type == "activation":
-                await email_service.send_activation_email(recipient, link)
-            elif email_type == "activation_complete":
-                await email_service.send_activation_complete_email(recipient, link)
-            elif email_type == "password_reset":
-                await email_service.send_password_reset_email(recipient, link)
-            elif email_type == "password_reset_complete":
-                await email_service.send_password_reset_complete_email(recipient, link)
-            else:
-                raise ValueError(f"Unknown email type: {email_type}")
-        except asyncio.CancelledError:
-            logger.warning(f"Email sending task was cancelled for {recipient}")
-            raise send_email_task.retry(exc=None, countdown=60, max_retries=3)
-
-        logger.info(f"{email_type.capitalize()} email sent successfully to {recipient}")
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=300)
+def send_email_batch(self, items: list[dict]):
+    """
+    Send several emails over a single SMTP connection.
+
+    Args:
+        items (list[dict]): Emails to send, each with 'email_type', 'recipient'
+        and 'link' keys, using the same email types as `send_email_task`.
+
+    On failure the task is retried with only the items that were not sent yet.
+    """
+    logger.info("Sending batch of %d emails", len(items))
+    sent = []
+    try:
+        asyncio.run(_send_emails(items, sent))
+        logger.info("Batch of %d emails sent successfully", len(items))
     except Exception as e:
-        logger.error(f"Failed to send {email_type} email to {recipient}: {str(e)}", exc_info=True)
-        raise send_email_task.retry(exc=e, countdown=60, max_retries=3)
+        logger.error(
+            "Failed to send email batch after %d of %d emails: %s", len(sent), len(items), e,
+            exc_info=self.request.retries >= self.max_retries
+        )
+        raise self.retry(exc=e, countdown=60, args=(items[len(sent):],))
+
+
+def enqueue_emails(items: list[tuple[str, str, str]]) -> None:
+    """
+    Enqueue many emails as a few `send_email_batch` messages instead of one message per email.
+
+    Args:
+        items (list[tuple[str, str, str]]): (email_type, recipient, link) tuples.
+    """
+    emails = [
+        {"email_type": email_type, "recipient": recipient, "link": link}
+        for email_type, recipient, link in items
+    ]
+    if not emails:
+        return
+    group(
+        send_email_batch.s(emails[i:i + EMAIL_BATCH_SIZE])
+        for i in range(0, len(emails), EMAIL_BATCH_SIZE)
+    ).apply_async()
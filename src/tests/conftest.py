@@ -2,56 +2,246 @@ import os
 # Устанавливаем тестовое окружение до импорта модулей
 os.environ["ENVIRONMENT"] = "testing"
 
+import asyncio
 import pytest
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from typing import Optional
 
 import pytest_asyncio
+import stripe
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy import insert, select
+from pytest_asyncio import is_async_test
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.config.settings import Settings
-from src.config import get_settings
+from src.config import get_settings, get_jwt_auth_manager
 from src.database import (
     reset_sqlite_database,
-    get_db_contextmanager, UserGroupEnum, UserGroupModel, ActivationTokenModel, UserModel,
+    get_db, UserGroupEnum, UserGroupModel, ActivationTokenModel, UserModel,
 )
-from src.main import app
+from src.database.session_sqlite import engine
+from src.main import app as fastapi_app
 from src.providers.payment_provider import PaymentProviderInterface
 from src.repositories.payments.payments_repo import PaymentsRepository
 from src.services.payments.payments_service import PaymentService
 from src.database.models.payments import PaymentStatusEnum
+from src.security.passwords import pwd_context
 
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows and PyPy
+    uvloop = None
 
-@pytest_asyncio.fixture(scope="function", autouse=True)
-async def reset_db():
+# bcrypt with 14 rounds takes about a second per hash; tests only need matching hashes.
+pwd_context.load({"schemes": ["plaintext"]})
+
+
+def pytest_collection_modifyitems(items):
     """
-    Reset the SQLite database before each test.
+    Run every async test on the session-wide event loop.
 
-    This fixture ensures that the database is cleared and recreated for every test function.
-    It helps maintain test isolation by preventing data leakage between tests.
+    The engine, the schema and the HTTP client are created once per session, so tests
+    must share the loop they are bound to.
+    """
+    session_scope_marker = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_scope_marker, append=False)
+
+
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    """
+    Run the session event loop on uvloop, which ships with uvicorn[standard], when available.
+    """
+    if uvloop is None:
+        return asyncio.DefaultEventLoopPolicy()
+    return uvloop.EventLoopPolicy()
+
+
+@pytest.fixture(autouse=True)
+def fake_stripe(request, monkeypatch):
+    """
+    Replace the Stripe API calls used by the app with deterministic in-process fakes.
+
+    Tests marked with `integration` keep talking to the real Stripe API.
+    """
+    if request.node.get_closest_marker("integration"):
+        return
+
+    def create_payment_intent(**params):
+        payment_id = f"pi_{params['metadata']['order_id']}"
+        return {
+            "id": payment_id,
+            "client_secret": f"{payment_id}_secret",
+            "status": "requires_payment_method",
+        }
+
+    monkeypatch.setattr(stripe.PaymentIntent, "create", create_payment_intent)
+    monkeypatch.setattr(
+        stripe.PaymentIntent,
+        "retrieve",
+        lambda payment_id, **params: {"id": payment_id, "status": "succeeded"}
+    )
+    monkeypatch.setattr(stripe.Refund, "create", lambda **params: {"status": "succeeded"})
+    monkeypatch.setattr(stripe.WebhookSignature, "verify_header", lambda *args, **kwargs: True)
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def db_engine():
+    """
+    Create the SQLite schema once and share the engine with the whole test session.
+
+    The engine's pool is disposed when the session ends.
     """
     await reset_sqlite_database()
+    yield engine
+    await engine.dispose()
 
 
-@pytest_asyncio.fixture(scope="function")
-async def client():
-    """Provide an asynchronous test client for making HTTP requests."""
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def seeded_groups(db_engine):
+    """
+    Insert every group from UserGroupEnum once per session in a single statement.
+
+    Returns a mapping of group name to its id.
+    """
+    async with db_engine.begin() as conn:
+        result = await conn.execute(
+            insert(UserGroupModel)
+            .values([{"name": group} for group in UserGroupEnum])
+            .returning(UserGroupModel.id, UserGroupModel.name)
+        )
+        return {name: group_id for group_id, name in result.all()}
+
+
+@pytest.fixture(scope="session")
+def jwt_manager():
+    """Provide one JWT manager, with its signing keys loaded, for the whole test session."""
+    return get_jwt_auth_manager(get_settings())
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def seeded_accounts(db_engine, seeded_groups, jwt_manager):
+    """
+    Seed an active regular user and an active admin once per session.
+
+    The rows are committed before any per-test transaction is opened, so every test sees
+    them. Access tokens are signed directly with the JWT manager, with the same claims the
+    login endpoint uses, instead of logging in over HTTP. Returns the users' ids and tokens.
+    """
+    async with AsyncSession(bind=db_engine, expire_on_commit=False) as session:
+        user = UserModel.create(
+            email="user@example.com",
+            raw_password="UserPassword123!",
+            group_id=seeded_groups[UserGroupEnum.USER],
+        )
+        admin = UserModel.create(
+            email="admin@example.com",
+            raw_password="AdminPassword123!",
+            group_id=seeded_groups[UserGroupEnum.ADMIN],
+        )
+        user.is_active = True
+        admin.is_active = True
+        session.add_all([user, admin])
+        await session.commit()
+
+    return {
+        "user_id": user.id,
+        "user_token": jwt_manager.create_access_token({"user_id": user.id, "group_id": user.group_id}),
+        "admin_id": admin.id,
+        "admin_token": jwt_manager.create_access_token({"user_id": admin.id, "group_id": admin.group_id}),
+    }
+
+
+@pytest_asyncio.fixture(scope="function", loop_scope="session", autouse=True)
+async def db_connection(app, db_engine, seeded_accounts):
+    """
+    Wrap each test in an outer transaction that is rolled back afterwards.
+
+    Both the test sessions and the application sessions are bound to this connection and
+    commit into SAVEPOINTs, so every test starts from an empty database without recreating
+    the schema.
+    """
+    async with db_engine.connect() as connection:
+        transaction = await connection.begin()
+
+        async def override_get_db():
+            async with _savepoint_session(connection) as session:
+                yield session
+
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            yield connection
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+            await transaction.rollback()
+
+
+def _savepoint_session(connection) -> AsyncSession:
+    return AsyncSession(
+        bind=connection,
+        join_transaction_mode="create_savepoint",
+        expire_on_commit=False
+    )
+
+
+@pytest.fixture(scope="session")
+def app():
+    """Provide the FastAPI application, built once at import time, to the whole session."""
+    return fastapi_app
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def session_client(app):
+    """
+    Provide an asynchronous test client shared by the whole test session.
+
+    Requests are dispatched in-process through ASGITransport, without a server or sockets.
+    """
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as async_client:
         yield async_client
 
 
 @pytest_asyncio.fixture(scope="function")
-async def db_session():
+async def client(session_client):
+    """
+    Provide the shared test client, making sure no state leaks in from a previous test.
+    """
+    assert "Authorization" not in session_client.headers
+    session_client.cookies.clear()
+    yield session_client
+
+
+@pytest.fixture(scope="session")
+def regular_user_headers(regular_user_token):
+    """Return the Authorization header of the seeded regular user, built once per session."""
+    return {"Authorization": f"Bearer {regular_user_token}"}
+
+
+@pytest.fixture(scope="session")
+def admin_headers(admin_token):
+    """Return the Authorization header of the seeded admin, built once per session."""
+    return {"Authorization": f"Bearer {admin_token}"}
+
+
+@pytest.fixture(scope="session")
+def auth_headers(regular_user_headers, admin_headers):
+    """Return Authorization headers of the seeded users, keyed by role ("user" or "admin")."""
+    return {"user": regular_user_headers, "admin": admin_headers}
+
+
+@pytest_asyncio.fixture(scope="function")
+async def db_session(db_connection):
     """
     Provide an async database session for database interactions.
 
-    This fixture yields an async session using `get_db_contextmanager`, ensuring that the session
-    is properly closed after each test.
+    The session joins the per-test outer transaction, so its commits are rolled back
+    once the test finishes.
     """
-    async with get_db_contextmanager() as session:
+    async with _savepoint_session(db_connection) as session:
         yield session
 
 
@@ -70,14 +260,11 @@ async def user_data():
 @pytest_asyncio.fixture(scope="function")
 async def seed_user_groups(db_session: AsyncSession):
     """
-    Asynchronously seed the UserGroupModel table with default user groups.
+    Provide a database session in which all default user groups exist.
 
-    This fixture inserts all user groups defined in UserGroupEnum into the database and commits the transaction.
-    It then yields the asynchronous database session for further testing.
+    The groups from UserGroupEnum are seeded once per session by `seeded_groups`,
+    so this fixture only yields the asynchronous database session for further testing.
     """
-    groups = [{"name": group.value} for group in UserGroupEnum]
-    await db_session.execute(insert(UserGroupModel).values(groups))
-    await db_session.commit()
     yield db_session
 
 
@@ -93,40 +280,31 @@ async def registered_user(db_session):
     )
     db_session.add(user)
     await db_session.commit()
-    await db_session.refresh(user)
     return user
 
 
 @pytest_asyncio.fixture(scope="function")
-async def activation_token(db_session, registered_user):
-    """
-    Create an activation token for the registered user.
+async def registered_user_with_token(db_session, request):
     """
-    token = ActivationTokenModel(
-        token="valid-token",
-        user_id=registered_user.id,
-        expires_at=datetime.now(timezone.utc) + timedelta(hours=1)
-    )
-    db_session.add(token)
-    await db_session.commit()
-    await db_session.refresh(token)
-    return token
-
+    Create a registered user and an activation token for it in a single commit.
 
-@pytest_asyncio.fixture(scope="function")
-async def expired_activation_token(db_session, registered_user):
-    """
-    Create an expired activation token for the registered user.
+    Parametrize indirectly with "valid" (default) or "expired" to choose the token state.
+    Returns a (user, token) tuple.
     """
+    expired = getattr(request, "param", "valid") == "expired"
+    user = UserModel.create(
+        email="testuser@example.com",
+        raw_password="TestPassword123!",
+        group_id=1,
+    )
     token = ActivationTokenModel(
-        token="expired-token",
-        user_id=registered_user.id,
-        expires_at=datetime.now(timezone.utc) - timedelta(hours=1)
+        token="expired-token" if expired else "valid-token",
+        user=user,
+        expires_at=datetime.now(timezone.utc) + timedelta(hours=-1 if expired else 1)
     )
-    db_session.add(token)
+    db_session.add_all([user, token])
     await db_session.commit()
-    await db_session.refresh(token)
-    return token
+    return user, token
 
 
 @pytest.fixture
@@ -146,39 +324,28 @@ def payment_provider():
             self.last_payment_id = payment_id
             return f"https://payment.test/{payment_id}"
 
+        def _ensure(self, payment_id: str) -> Optional[dict]:
+            if payment_id.startswith("pi_"):
+                return self.payments.setdefault(payment_id, {
+                    "id": payment_id,
+                    "amount": Decimal("100.00"),
+                    "status": "succeeded"
+                })
+            return self.payments.get(payment_id)
+
         async def get_payment_intent(self, payment_id: str) -> dict:
-            if payment_id not in self.payments:
-                if payment_id.startswith("pi_"):
-                    self.payments[payment_id] = {
-                        "id": payment_id,
-                        "amount": Decimal("100.00"),
-                        "status": "succeeded"
-                    }
-            return self.payments.get(payment_id, {"id": payment_id, "status": "succeeded"})
+            return self._ensure(payment_id) or {"id": payment_id, "status": "succeeded"}
 
         async def complete_payment(self, payment_id: str) -> bool:
-            if payment_id not in self.payments:
-                if payment_id.startswith("pi_"):
-                    self.payments[payment_id] = {
-                        "id": payment_id,
-                        "amount": Decimal("100.00"),
-                        "status": "succeeded"
-                    }
-            if payment_id in self.payments:
-                self.payments[payment_id]["status"] = "succeeded"
+            payment = self._ensure(payment_id)
+            if payment:
+                payment["status"] = "succeeded"
             return True
 
         async def refund_payment(self, payment_id: str, amount: Optional[Decimal] = None) -> bool:
-            if payment_id not in self.payments:
-                if payment_id.startswith("pi_"):
-                    self.payments[payment_id] = {
-                        "id": payment_id,
-                        "amount": Decimal("100.00"),
-                        "status": "succeeded"
-                    }
-            if payment_id in self.payments and self.payments[payment_id]["status"] == "succeeded":
-                self.payments[payment_id]["status"] = "refunded"
-                return True
+            payment = self._ensure(payment_id)
+            if payment and payment["status"] == "succeeded":
+                payment["status"] = "refunded"
             return True
 
         def get_last_payment_intent_id(self) -> Optional[str]:
@@ -230,7 +397,6 @@ async def test_user(db_session):
     )
     db_session.add(user)
     await db_session.commit()
-    await db_session.refresh(user)
     return user
 
 
@@ -240,62 +406,16 @@ async def movie_repository(db_session):
     return MovieRepository(db_session)
 
 
-@pytest_asyncio.fixture
-async def admin_token(client, db_session):
-    """Create an admin user and return their access token."""
-    admin_group = UserGroupModel(name=UserGroupEnum.ADMIN.value)
-    db_session.add(admin_group)
-    await db_session.commit()
-
-    admin = UserModel.create(
-        email="admin@example.com",
-        raw_password="AdminPassword123!",
-        group_id=admin_group.id,
-    )
-    db_session.add(admin)
-    await db_session.commit()
-
-    admin.is_active = True
-    await db_session.commit()
-
-    response = await client.post(
-        "/api/v1/accounts/login/",
-        data={
-            "username": "admin@example.com",
-            "password": "AdminPassword123!"
-        }
-    )
-    assert response.status_code == 200
-    return response.json()["access_token"]
-
-
-@pytest_asyncio.fixture
-async def regular_user_token(client, db_session):
-    """Create a regular user and return their access token."""
-    user_group = UserGroupModel(name=UserGroupEnum.USER.value)
-    db_session.add(user_group)
-    await db_session.commit()
-
-    user = UserModel.create(
-        email="user@example.com",
-        raw_password="UserPassword123!",
-        group_id=user_group.id,
-    )
-    db_session.add(user)
-    await db_session.commit()
+@pytest.fixture(scope="session")
+def admin_token(seeded_accounts):
+    """Return the access token of the seeded admin user."""
+    return seeded_accounts["admin_token"]
 
-    user.is_active = True
-    await db_session.commit()
 
-    response = await client.post(
-        "/api/v1/accounts/login/",
-        data={
-            "username": "user@example.com",
-            "password": "UserPassword123!"
-        }
-    )
-    assert response.status_code == 200
-    return response.json()["access_token"]
+@pytest.fixture(scope="session")
+def regular_user_token(seeded_accounts):
+    """Return the access token of the seeded regular user."""
+    return seeded_accounts["user_token"]
 
 
 @pytest_asyncio.fixture
@@ -316,7 +436,6 @@ async def test_movie(db_session):
     )
     db_session.add(movie)
     await db_session.commit()
-    await db_session.refresh(movie)
     return movie
 
 
@@ -329,34 +448,24 @@ async def test_certification(db_session):
     certification = CertificationModel(name="PG-13")
     db_session.add(certification)
     await db_session.commit()
-    await db_session.refresh(certification)
     return certification
 
 
 @pytest_asyncio.fixture
-async def test_cart(db_session, regular_user_token, admin_token):
+async def test_cart(db_session, seeded_accounts):
     """
-    Create test carts for both regular user and admin.
+    Create test carts for both regular user and admin and return the regular user's cart.
     """
     from src.database.models.cart import CartModel
-    from src.database.models.accounts import UserModel
-    from sqlalchemy import select
-    
-    users = await db_session.execute(
-        select(UserModel).where(
-            UserModel.email.in_(["user@example.com", "admin@example.com"])
-        )
+
+    result = await db_session.scalars(
+        insert(CartModel).returning(CartModel),
+        [
+            {"user_id": seeded_accounts["user_id"]},
+            {"user_id": seeded_accounts["admin_id"]},
+        ]
     )
-    users = users.scalars().all()
-    
-    carts = []
-    for user in users:
-        cart = CartModel(user_id=user.id)
-        db_session.add(cart)
-        carts.append(cart)
-    
+    carts = result.all()
     await db_session.commit()
-    for cart in carts:
-        await db_session.refresh(cart)
-    
-    return next(cart for cart in carts if cart.user_id == users[0].id)
+
+    return next(cart for cart in carts if cart.user_id == seeded_accounts["user_id"])
@@ -0,0 +1,38 @@
+from decimal import Decimal
+from typing import Optional
+
+from src.database.models.orders import OrderStatusEnum, Orders
+from src.database.models.payments import PaymentStatusEnum, Payment
+
+
+_AMOUNT = Decimal("100.00")
+
+
+def make_order(
+        user_id: int,
+        status: OrderStatusEnum = OrderStatusEnum.PENDING,
+        total_amount: Decimal = _AMOUNT
+) -> Orders:
+    """Build an unsaved order with the default test amount."""
+    return Orders(
+        user_id=user_id,
+        total_amount=total_amount,
+        status=status
+    )
+
+
+def make_payment(
+        order_id: int,
+        user_id: int,
+        amount: Decimal = _AMOUNT,
+        status: PaymentStatusEnum = PaymentStatusEnum.SUCCESSFUL,
+        external_payment_id: Optional[str] = None
+) -> Payment:
+    """Build an unsaved payment for the given order with the default test amount."""
+    return Payment(
+        user_id=user_id,
+        order_id=order_id,
+        amount=amount,
+        status=status,
+        external_payment_id=external_payment_id
+    )
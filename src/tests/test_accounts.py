@@ -1,4 +1,4 @@
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone
 
 import pytest
 from httpx import AsyncClient
@@ -70,34 +70,29 @@ async def test_register_user_conflict(client, db_session, seed_user_groups, user
 
 
 @pytest.mark.asyncio
-async def test_activate_account_expired_token(client: AsyncClient, expired_activation_token):
+@pytest.mark.parametrize("registered_user_with_token", ["expired"], indirect=True)
+async def test_activate_account_expired_token(client: AsyncClient, registered_user_with_token):
     """
     Test activation with an expired token.
     """
+    _, expired_token = registered_user_with_token
     response = await client.post(
         "/api/v1/accounts/activate/",
-        json={"token": expired_activation_token.token}
+        json={"token": expired_token.token}
     )
     assert response.status_code == 400
     assert response.json()["detail"] == "Invalid or expired activation token."
 
 
 @pytest.mark.asyncio
-async def test_activate_account_already_active(client: AsyncClient, registered_user, db_session):
+async def test_activate_account_already_active(client: AsyncClient, registered_user_with_token, db_session):
     """
     Test activation for an already active user.
     """
+    registered_user, token = registered_user_with_token
     registered_user.is_active = True
     await db_session.commit()
 
-    token = ActivationTokenModel(
-        token="valid-token-for-active-user",
-        user_id=registered_user.id,
-        expires_at=datetime.now(timezone.utc) + timedelta(hours=1)
-    )
-    db_session.add(token)
-    await db_session.commit()
-
     response = await client.post(
         "/api/v1/accounts/activate/",
         json={"token": token.token}
@@ -153,4 +148,17 @@ async def test_request_password_reset_nonexistent_email(client: AsyncClient):
     assert response.status_code == 200
     assert response.json()["message"] == ("If you are registered, "
                                           "you  wil receive an email with instructions."
-                                          )
\ No newline at end of file
+                                          )
+
+
+@pytest.mark.asyncio
+async def test_login_user(client: AsyncClient, seeded_accounts, jwt_manager):
+    response = await client.post(
+        "/api/v1/accounts/login/",
+        data={"username": "user@example.com", "password": "UserPassword123!"}
+    )
+    assert response.status_code == 200
+    response_data = response.json()
+    assert response_data["token_type"] == "bearer"
+    payload = jwt_manager.decode_access_token(response_data["access_token"])
+    assert payload["user_id"] == seeded_accounts["user_id"]
@@ -1,43 +1,58 @@
 import pytest
-from decimal import Decimal
+import pytest_asyncio
 from typing import Dict, Any
 
-from src.database.models.movies import (
-    MovieModel, CertificationModel, GenreModel,
-    DirectorModel, StarModel
-)
+
+MOVIE_DATA = {
+    "title": "New Test Movie",
+    "year": 2024,
+    "time": 120,
+    "imdb": 8.0,
+    "meta_score": 75.0,
+    "description": "Test description",
+    "price": 9.99,
+    "genre_ids": [],
+    "director_ids": [],
+    "star_ids": []
+}
+
+
+@pytest.fixture
+def movie_data(test_certification) -> Dict[str, Any]:
+    return {**MOVIE_DATA, "certification_id": test_certification.id}
+
+
+@pytest_asyncio.fixture
+async def create_movie(client, auth_headers, movie_data):
+    """
+    Return a helper that creates a movie as admin and returns the response body.
+    """
+    async def _create_movie(**overrides) -> Dict[str, Any]:
+        response = await client.post(
+            "/api/v1/movies/",
+            json={**movie_data, **overrides},
+            headers=auth_headers["admin"]
+        )
+        assert response.status_code == 201
+        return response.json()
+
+    return _create_movie
 
 
 @pytest.mark.asyncio
-async def test_movie_full_flow(client, admin_token, regular_user_token, db_session, test_certification):
-    headers_admin = {"Authorization": f"Bearer {admin_token}"}
-    movie_data = {
-        "title": "New Test Movie",
-        "year": 2024,
-        "time": 120,
-        "imdb": 8.0,
-        "meta_score": 75.0,
-        "description": "Test description",
-        "price": 9.99,
-        "certification_id": test_certification.id,
-        "genre_ids": [],
-        "director_ids": [],
-        "star_ids": []
-    }
-    
-    response = await client.post("/api/v1/movies/", json=movie_data, headers=headers_admin)
-    assert response.status_code == 201
-    movie = response.json()
-    assert movie["title"] == movie_data["title"]
-    assert movie["price"] == movie_data["price"]
-    
-    headers_user = {"Authorization": f"Bearer {regular_user_token}"}
+async def test_movie_full_flow(client, auth_headers, create_movie):
+    headers_admin = auth_headers["admin"]
+    movie = await create_movie()
+    assert movie["title"] == MOVIE_DATA["title"]
+    assert movie["price"] == MOVIE_DATA["price"]
+
+    headers_user = auth_headers["user"]
     response = await client.get(f"/api/v1/movies/{movie['id']}", headers=headers_user)
     assert response.status_code == 200
     movie_details = response.json()
     assert movie_details["id"] == movie["id"]
-    assert movie_details["title"] == movie_data["title"]
-    
+    assert movie_details["title"] == MOVIE_DATA["title"]
+
     update_data = {
         "title": "Updated Test Movie",
         "price": 14.99
@@ -51,23 +66,23 @@ async def test_movie_full_flow(client, admin_token, regular_user_token, db_sessi
     updated_movie = response.json()
     assert updated_movie["title"] == update_data["title"]
     assert updated_movie["price"] == update_data["price"]
-    
+
     response = await client.delete(f"/api/v1/movies/{movie['id']}", headers=headers_admin)
     assert response.status_code == 204
-    
+
     response = await client.get(f"/api/v1/movies/{movie['id']}", headers=headers_user)
     assert response.status_code == 404
 
 
 @pytest.mark.asyncio
-async def test_movies_collection(client, admin_token, test_movie, regular_user_token, test_certification):
-    headers_user = {"Authorization": f"Bearer {regular_user_token}"}
-    
+async def test_movies_collection(client, test_movie, auth_headers, create_movie):
+    headers_user = auth_headers["user"]
+
     response = await client.get("/api/v1/movies/", headers=headers_user)
     assert response.status_code == 200
     movies_list = response.json()
     assert len(movies_list) >= 1
-    
+
     response = await client.get(
         "/api/v1/movies/",
         params={
@@ -81,23 +96,15 @@ async def test_movies_collection(client, admin_token, test_movie, regular_user_t
     filtered_movies = response.json()
     assert all(movie["year"] == test_movie.year for movie in filtered_movies)
 
-    headers_admin = {"Authorization": f"Bearer {admin_token}"}
-    movie_data = {
-        "title": "Expensive Movie",
-        "year": 2024,
-        "time": 180,
-        "imdb": 9.0,
-        "meta_score": 85.0,
-        "description": "Expensive movie description",
-        "price": 19.99,
-        "certification_id": test_certification.id,
-        "genre_ids": [],
-        "director_ids": [],
-        "star_ids": []
-    }
-    response = await client.post("/api/v1/movies/", json=movie_data, headers=headers_admin)
-    assert response.status_code == 201
-    
+    await create_movie(
+        title="Expensive Movie",
+        time=180,
+        imdb=9.0,
+        meta_score=85.0,
+        description="Expensive movie description",
+        price=19.99
+    )
+
     response = await client.get(
         "/api/v1/movies/",
         params={
@@ -114,41 +121,30 @@ async def test_movies_collection(client, admin_token, test_movie, regular_user_t
 
 
 @pytest.mark.asyncio
-async def test_movies_permissions(client, admin_token, regular_user_token, test_movie, test_certification):
-    headers_admin = {"Authorization": f"Bearer {admin_token}"}
-    headers_user = {"Authorization": f"Bearer {regular_user_token}"}
-    
-    response = await client.get(f"/api/v1/movies/{test_movie.id}", headers=headers_user)
-    assert response.status_code == 200
-
-    movie_data = {
-        "title": "User's Movie",
-        "year": 2024,
-        "time": 120,
-        "imdb": 8.0,
-        "meta_score": 75.0,
-        "description": "Test description",
-        "price": 9.99,
-        "certification_id": test_certification.id,
-        "genre_ids": [],
-        "director_ids": [],
-        "star_ids": []
+@pytest.mark.parametrize(
+    "role, method, expected_status",
+    [
+        ("user", "GET", 200),
+        ("user", "POST", 403),
+        ("user", "PATCH", 403),
+        ("user", "DELETE", 403),
+        ("admin", "DELETE", 204),
+    ]
+)
+async def test_movies_permissions(
+    client,
+    auth_headers,
+    test_movie,
+    movie_data,
+    role,
+    method,
+    expected_status
+):
+    payloads = {
+        "POST": {**movie_data, "title": "User's Movie"},
+        "PATCH": {"title": "Updated by User"},
     }
-    response = await client.post("/api/v1/movies/", json=movie_data, headers=headers_user)
-    assert response.status_code == 403
-
-    update_data = {"title": "Updated by User"}
-    response = await client.patch(
-        f"/api/v1/movies/{test_movie.id}",
-        json=update_data,
-        headers=headers_user
-    )
-    assert response.status_code == 403
-    
-
-    response = await client.delete(f"/api/v1/movies/{test_movie.id}", headers=headers_user)
-    assert response.status_code == 403
-    
+    url = "/api/v1/movies/" if method == "POST" else f"/api/v1/movies/{test_movie.id}"
 
-    response = await client.delete(f"/api/v1/movies/{test_movie.id}", headers=headers_admin)
-    assert response.status_code == 204 
+    response = await client.request(method, url, json=payloads.get(method), headers=auth_headers[role])
+    assert response.status_code == expected_status
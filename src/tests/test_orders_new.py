@@ -1,19 +1,35 @@
 import pytest
-from decimal import Decimal
+import pytest_asyncio
+from sqlalchemy import func, select
 
+from src.database.models.cart import CartItemsModel, CartModel
 from src.database.models.orders import OrderStatusEnum
 from src.repositories.cart.cart_rep import CartRepository
 
 
-async def create_order_with_movie(client, user_token, cart_repo, movie_id, user_id):
-    try:
-        await cart_repo.delete(user_id)
-    except:
-        pass
-    
+_PENDING = OrderStatusEnum.PENDING.value
+
+
+@pytest_asyncio.fixture
+async def empty_cart(db_session, seeded_accounts):
+    """
+    Return a cart repository, failing fast if the regular user's cart is not empty.
+
+    Test isolation relies on rolling back every test's writes, so a leftover item means
+    that isolation is broken.
+    """
+    items_count = await db_session.scalar(
+        select(func.count(CartItemsModel.id))
+        .join(CartModel)
+        .where(CartModel.user_id == seeded_accounts["user_id"])
+    )
+    assert items_count == 0, "cart items leaked from a previous test"
+    return CartRepository(db_session)
+
+
+async def _post_order(client, headers, cart_repo, movie_id, user_id):
     await cart_repo.add_movie(user_id, movie_id)
     
-    headers = {"Authorization": f"Bearer {user_token}"}
     response = await client.post("/api/v1/orders/", headers=headers)
     assert response.status_code == 201
     return response.json()
@@ -21,106 +37,94 @@ async def create_order_with_movie(client, user_token, cart_repo, movie_id, user_
 @pytest.mark.asyncio
 async def test_create_order_basic_flow(
     client,
-    regular_user_token,
-    db_session,
+    regular_user_headers,
+    empty_cart,
+    seeded_accounts,
     test_movie,
     test_cart
 ):
-    cart_repo = CartRepository(db_session)
-    user_id = 1
+    user_id = seeded_accounts["user_id"]
+    expected_total = format(test_movie.price, "f")
     
-    order = await create_order_with_movie(
+    order = await _post_order(
         client,
-        regular_user_token,
-        cart_repo,
+        regular_user_headers,
+        empty_cart,
         test_movie.id,
         user_id
     )
-    assert order["status"] == OrderStatusEnum.PENDING.value
+    assert order["status"] == _PENDING
     assert len(order["order_items"]) == 1
     assert order["order_items"][0]["movie_id"] == test_movie.id
-    assert Decimal(order["total_amount"]) == test_movie.price
+    assert order["total_amount"] == expected_total
     assert order["user_id"] == user_id
 
 @pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "transitions, expected_status",
+    [
+        pytest.param(["cancel"], OrderStatusEnum.CANCELED, id="cancel"),
+        # Initiating a payment leaves the order pending, so it can still be canceled.
+        pytest.param(["pay"], OrderStatusEnum.PENDING, id="pay"),
+        pytest.param(["pay", "cancel"], OrderStatusEnum.CANCELED, id="pay-cancel"),
+    ]
+)
 async def test_order_status_transitions(
     client,
-    regular_user_token,
-    admin_token,
-    db_session,
-    test_movie
+    regular_user_headers,
+    empty_cart,
+    order_repository,
+    seeded_accounts,
+    test_movie,
+    transitions,
+    expected_status
 ):
-    cart_repo = CartRepository(db_session)
-    user_id = 1
+    user_id = seeded_accounts["user_id"]
     
-    order = await create_order_with_movie(
+    order = await _post_order(
         client,
-        regular_user_token,
-        cart_repo,
+        regular_user_headers,
+        empty_cart,
         test_movie.id,
         user_id
     )
-    assert order["status"] == OrderStatusEnum.PENDING.value
-    
-    headers_user = {"Authorization": f"Bearer {regular_user_token}"}
-    response = await client.post(
-        f"/api/v1/orders/{order['id']}/cancel",
-        headers=headers_user
-    )
-    assert response.status_code == 200
+    assert order["status"] == _PENDING
     
-    order = await create_order_with_movie(
-        client,
-        regular_user_token,
-        cart_repo,
-        test_movie.id,
-        user_id
-    )
-    assert order["status"] == OrderStatusEnum.PENDING.value
-    
-    response = await client.post(
-        f"/api/v1/orders/{order['id']}/pay",
-        headers=headers_user
-    )
-    assert response.status_code == 200
-    
-    response = await client.post(
-        f"/api/v1/orders/{order['id']}/cancel",
-        headers=headers_user
-    )
-    assert response.status_code == 200
+    for transition in transitions:
+        response = await client.post(
+            f"/api/v1/orders/{order['id']}/{transition}",
+            headers=regular_user_headers
+        )
+        assert response.status_code == 200
+
+    stored_order = await order_repository.get_order_by_id(order["id"])
+    assert stored_order.status == expected_status
 
 @pytest.mark.asyncio
 async def test_admin_order_listing(
     client,
-    admin_token,
-    regular_user_token,
-    db_session,
+    regular_user_headers,
+    admin_headers,
+    empty_cart,
+    seeded_accounts,
     test_movie
 ):
-    cart_repo = CartRepository(db_session)
-    user_id = 2  # ID обычного пользователя
+    user_id = seeded_accounts["user_id"]
     
-    order = await create_order_with_movie(
+    await _post_order(
         client,
-        regular_user_token,
-        cart_repo,
+        regular_user_headers,
+        empty_cart,
         test_movie.id,
         user_id
     )
     
-    headers_admin = {"Authorization": f"Bearer {admin_token}"}
-    response = await client.get("/api/v1/orders/admin", headers=headers_admin)
-    assert response.status_code == 200
-    orders_list = response.json()
-    assert len(orders_list) >= 1
-    
     response = await client.get(
         "/api/v1/orders/admin",
-        params={"status": OrderStatusEnum.PENDING.value},
-        headers=headers_admin
+        params={"status": _PENDING},
+        headers=admin_headers
     )
     assert response.status_code == 200
     filtered_orders = response.json()
-    assert all(order["status"] == OrderStatusEnum.PENDING.value for order in filtered_orders)
+    assert all(order["status"] == _PENDING for order in filtered_orders)
     assert len(filtered_orders) >= 1 
\ No newline at end of file
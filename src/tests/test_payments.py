@@ -1,10 +1,14 @@
+import os
+
 import pytest
+import pytest_asyncio
 from decimal import Decimal
-from datetime import datetime
 from fastapi import HTTPException
 
-from src.database.models.orders import OrderStatusEnum, Orders
-from src.database.models.payments import PaymentStatusEnum, Payment
+from src.database.models.orders import OrderStatusEnum, OrderItems
+from src.database.models.payments import PaymentStatusEnum
+from src.providers.stripe_payment_provider import StripePaymentProvider
+from src.tests.factories import make_order, make_payment
 
 
 @pytest.mark.asyncio
@@ -13,17 +17,9 @@ async def test_initiate_payment_success(
     order_repository,
     test_user,
 ):
-    order_id = 1
     user_id = test_user.id
-    total_amount = Decimal("100.00")
-    
-    order = Orders(
-        user_id=user_id,
-        total_amount=total_amount,
-        status=OrderStatusEnum.PENDING,
-        created_at=datetime.now()
-    )
-    order = await order_repository.create_order(order)
+
+    order = await order_repository.create_order(make_order(user_id))
     
     payment_url = await payment_service.initiate_payment(order.id, user_id)
     
@@ -31,6 +27,29 @@ async def test_initiate_payment_success(
     assert payment_url.endswith(str(order.id))
 
 
+@pytest.mark.asyncio
+async def test_initiate_payment_creates_payment_items(
+    payment_service,
+    payment_repository,
+    order_repository,
+    test_user,
+    test_movie
+):
+    order = make_order(test_user.id, total_amount=test_movie.price)
+    order.order_items = [
+        OrderItems(movie_id=test_movie.id, price_at_order=test_movie.price)
+    ]
+    order = await order_repository.create_order(order)
+
+    await payment_service.initiate_payment(order.id, test_user.id)
+
+    payment = await payment_repository.get_payment_by_external_id(f"pi_{order.id}")
+    assert payment is not None
+    assert len(payment.payment_items) == 1
+    assert payment.payment_items[0].order_item_id == order.order_items[0].id
+    assert payment.payment_items[0].price_at_payment == test_movie.price
+
+
 @pytest.mark.asyncio
 async def test_initiate_payment_order_not_found(payment_service, test_user):
     non_existent_order_id = 9999
@@ -49,13 +68,7 @@ async def test_initiate_payment_unauthorized(
     test_user
 ):
     wrong_user_id = test_user.id + 1
-    order = Orders(
-        user_id=test_user.id,
-        total_amount=Decimal("100.00"),
-        status=OrderStatusEnum.PENDING,
-        created_at=datetime.now()
-    )
-    order = await order_repository.create_order(order)
+    order = await order_repository.create_order(make_order(test_user.id))
     
     with pytest.raises(HTTPException) as exc_info:
         await payment_service.initiate_payment(order.id, wrong_user_id)
@@ -70,21 +83,13 @@ async def test_complete_payment_success(
     order_repository,
     test_user
 ):
-    order = Orders(
-        user_id=test_user.id,
-        total_amount=Decimal("100.00"),
-        status=OrderStatusEnum.PENDING,
-        created_at=datetime.now()
-    )
-    order = await order_repository.create_order(order)
+    order = await order_repository.create_order(make_order(test_user.id))
     
-    payment = Payment(
-        user_id=test_user.id,
-        order_id=order.id,
-        amount=Decimal("100.00"),
+    payment = make_payment(
+        order.id,
+        test_user.id,
         status=PaymentStatusEnum.PENDING,
-        external_payment_id=f"pi_{order.id}",
-        created_at=datetime.now()
+        external_payment_id=f"pi_{order.id}"
     )
     await payment_repository.create_payment(payment)
     
@@ -102,22 +107,11 @@ async def test_refund_payment_success(
     order_repository,
     test_user
 ):
-    order = Orders(
-        user_id=test_user.id,
-        total_amount=Decimal("100.00"),
-        status=OrderStatusEnum.PAID,
-        created_at=datetime.now()
+    order = await order_repository.create_order(
+        make_order(test_user.id, status=OrderStatusEnum.PAID)
     )
-    order = await order_repository.create_order(order)
     
-    payment = Payment(
-        user_id=test_user.id,
-        order_id=order.id,
-        amount=Decimal("100.00"),
-        status=PaymentStatusEnum.SUCCESSFUL,
-        external_payment_id=f"pi_{order.id}",
-        created_at=datetime.now()
-    )
+    payment = make_payment(order.id, test_user.id, external_payment_id=f"pi_{order.id}")
     payment = await payment_repository.create_payment(payment)
     
     refunded_payment = await payment_service.refund_payment(
@@ -130,28 +124,42 @@ async def test_refund_payment_success(
 
 
 @pytest.mark.asyncio
-async def test_get_user_payments(
+async def test_refund_payment_unauthorized(
     payment_service,
     payment_repository,
+    order_repository,
     test_user
 ):
-    payment1 = Payment(
-        user_id=test_user.id,
-        order_id=1,
-        amount=Decimal("100.00"),
-        status=PaymentStatusEnum.SUCCESSFUL,
-        created_at=datetime.now()
-    )
-    payment2 = Payment(
-        user_id=test_user.id,
-        order_id=2,
-        amount=Decimal("200.00"),
-        status=PaymentStatusEnum.SUCCESSFUL,
-        created_at=datetime.now()
+    order = await order_repository.create_order(
+        make_order(test_user.id, status=OrderStatusEnum.PAID)
     )
-    await payment_repository.create_payment(payment1)
-    await payment_repository.create_payment(payment2)
-    
+
+    payment = make_payment(order.id, test_user.id, external_payment_id=f"pi_{order.id}")
+    await payment_repository.create_payment(payment)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await payment_service.refund_payment(order_id=order.id, user_id=test_user.id + 1)
+    assert exc_info.value.status_code == 403
+    assert exc_info.value.detail == "Not authorized"
+
+
+@pytest_asyncio.fixture
+async def seeded_payments(payment_repository, order_repository, test_user):
+    """
+    Create one order for the test user and two successful payments for it.
+
+    Returns an (order, payments) tuple.
+    """
+    order = await order_repository.create_order(make_order(test_user.id))
+    payments = await payment_repository.create_payments([
+        make_payment(order.id, test_user.id, amount=Decimal("50.00")),
+        make_payment(order.id, test_user.id, amount=Decimal("50.00")),
+    ])
+    return order, payments
+
+
+@pytest.mark.asyncio
+async def test_get_user_payments(payment_service, seeded_payments, test_user):
     payments = await payment_service.get_user_payments(test_user.id)
     
     assert len(payments) == 2
@@ -159,39 +167,40 @@ async def test_get_user_payments(
 
 
 @pytest.mark.asyncio
-async def test_get_order_payments(
+async def test_get_order_payments(payment_service, seeded_payments, test_user):
+    order, _ = seeded_payments
+
+    payments = await payment_service.get_order_payments(order.id, test_user.id)
+    
+    assert len(payments) == 2
+    assert all(p.order_id == order.id for p in payments)
+    assert all(p.user_id == test_user.id for p in payments)
+
+
+@pytest.mark.asyncio
+async def test_get_order_payments_unauthorized(
     payment_service,
     payment_repository,
     order_repository,
     test_user
 ):
-    order = Orders(
-        user_id=test_user.id,
-        total_amount=Decimal("100.00"),
-        status=OrderStatusEnum.PENDING,
-        created_at=datetime.now()
-    )
-    order = await order_repository.create_order(order)
-    
-    payment1 = Payment(
-        user_id=test_user.id,
-        order_id=order.id,
-        amount=Decimal("50.00"),
-        status=PaymentStatusEnum.SUCCESSFUL,
-        created_at=datetime.now()
-    )
-    payment2 = Payment(
-        user_id=test_user.id,
-        order_id=order.id,
-        amount=Decimal("50.00"),
-        status=PaymentStatusEnum.SUCCESSFUL,
-        created_at=datetime.now()
-    )
-    await payment_repository.create_payment(payment1)
-    await payment_repository.create_payment(payment2)
-    
-    payments = await payment_service.get_order_payments(order.id, test_user.id)
-    
-    assert len(payments) == 2
-    assert all(p.order_id == order.id for p in payments)
-    assert all(p.user_id == test_user.id for p in payments) 
+    order = await order_repository.create_order(make_order(test_user.id))
+
+    payment = make_payment(order.id, test_user.id)
+    await payment_repository.create_payment(payment)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await payment_service.get_order_payments(order.id, test_user.id + 1)
+    assert exc_info.value.status_code == 403
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(not os.getenv("STRIPE_API_KEY"), reason="STRIPE_API_KEY is not set")
+async def test_stripe_provider_creates_payment_intent():
+    provider = StripePaymentProvider(api_key=os.environ["STRIPE_API_KEY"])
+
+    client_secret = await provider.initiate_payment("1", Decimal("1.00"), "usd")
+
+    assert client_secret
+    payment_intent = await provider.get_payment_intent(provider.get_last_payment_intent_id())
+    assert payment_intent["id"] == provider.get_last_payment_intent_id()
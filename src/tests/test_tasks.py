@@ -0,0 +1,205 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import aiosmtplib
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.database.models.accounts import RefreshTokenModel
+from src.database.models.base import Base
+from src.services.emails import EmailSenderService
+from src.tasks import accounts as account_tasks
+from src.tasks.accounts import EMAIL_BATCH_SIZE, _delete_expired_tokens, enqueue_emails, send_email_batch
+
+
+@pytest_asyncio.fixture
+async def tokens_engine(tmp_path):
+    """
+    Provide an engine for a separate SQLite file database with the schema created.
+
+    The cleanup opens its own transactions, so it cannot run on the shared test connection.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'tokens.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def seeded_refresh_tokens(tokens_engine):
+    """Insert 12 expired and 3 live refresh tokens and return the live tokens' values."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    rows = [
+        {"user_id": 1, "token": f"expired-{i}", "expires_at": now - timedelta(days=1)}
+        for i in range(12)
+    ] + [
+        {"user_id": 1, "token": f"live-{i}", "expires_at": now + timedelta(days=1)}
+        for i in range(3)
+    ]
+    async with tokens_engine.begin() as conn:
+        await conn.execute(RefreshTokenModel.__table__.insert(), rows)
+    return {row["token"] for row in rows if row["token"].startswith("live")}
+
+
+async def _stored_tokens(engine) -> set[str]:
+    async with engine.connect() as conn:
+        result = await conn.execute(select(RefreshTokenModel.token))
+        return set(result.scalars().all())
+
+
+@pytest.mark.asyncio
+async def test_delete_expired_tokens_in_batches(tokens_engine, seeded_refresh_tokens):
+    deleted = await _delete_expired_tokens(tokens_engine, batch_size=5, time_budget=60)
+
+    assert deleted == 12
+    assert await _stored_tokens(tokens_engine) == seeded_refresh_tokens
+
+
+@pytest.mark.asyncio
+async def test_delete_expired_tokens_stops_when_time_budget_is_spent(
+    tokens_engine,
+    seeded_refresh_tokens
+):
+    deleted = await _delete_expired_tokens(tokens_engine, batch_size=5, time_budget=0)
+
+    assert deleted == 5
+    assert len(await _stored_tokens(tokens_engine)) == 10
+
+
+class FakeSMTP:
+    """Record what is sent over one SMTP connection; fails for recipients starting with "fail"."""
+
+    def __init__(self):
+        self.recipients = []
+        self.quit_calls = 0
+
+    async def sendmail(self, sender, recipients, message):
+        if recipients[0].startswith("fail"):
+            raise aiosmtplib.SMTPException("rejected")
+        self.recipients.extend(recipients)
+
+    async def quit(self):
+        self.quit_calls += 1
+
+
+class RetryRequested(Exception):
+    pass
+
+
+@pytest.fixture
+def smtp_connections(tmp_path, monkeypatch):
+    """
+    Route the email tasks through an EmailSenderService whose SMTP connections are fakes.
+
+    Returns the list of connections opened, in order.
+    """
+    for name in ("activation.html", "activation_complete.html", "reset.html", "reset_complete.html"):
+        (tmp_path / name).write_text("{{ email }}")
+    service = EmailSenderService(
+        hostname="smtp.test",
+        port=587,
+        email="noreply@example.com",
+        password="password",
+        use_tls=False,
+        template_dir=str(tmp_path),
+        activation_email_template_name="activation.html",
+        activation_complete_email_template_name="activation_complete.html",
+        password_email_template_name="reset.html",
+        password_complete_email_template_name="reset_complete.html",
+    )
+    connections = []
+
+    async def connect():
+        connections.append(FakeSMTP())
+        return connections[-1]
+
+    monkeypatch.setattr(service, "_connect", connect)
+    monkeypatch.setattr(account_tasks, "_get_email_service", lambda: service)
+    return connections
+
+
+async def _run_task(task, *args):
+    """
+    Run a task body in a worker thread.
+
+    The email tasks call asyncio.run(), which would otherwise detach the session
+    event loop from the main thread.
+    """
+    return await asyncio.to_thread(task, *args)
+
+
+def _email_items(*recipients: str) -> list[dict]:
+    return [
+        {"email_type": "activation", "recipient": recipient, "link": "http://test/activate"}
+        for recipient in recipients
+    ]
+
+
+@pytest.mark.asyncio
+async def test_send_email_batch_uses_one_smtp_connection(smtp_connections):
+    items = _email_items("a@example.com", "b@example.com", "c@example.com")
+
+    await _run_task(send_email_batch, items)
+
+    assert len(smtp_connections) == 1
+    assert smtp_connections[0].recipients == ["a@example.com", "b@example.com", "c@example.com"]
+    assert smtp_connections[0].quit_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_send_email_batch_retries_only_unsent_items(smtp_connections, monkeypatch):
+    items = _email_items("a@example.com", "fail@example.com", "c@example.com")
+    retry_calls = []
+
+    def retry(**kwargs):
+        retry_calls.append(kwargs)
+        return RetryRequested()
+
+    monkeypatch.setattr(send_email_batch, "retry", retry)
+
+    with pytest.raises(RetryRequested):
+        await _run_task(send_email_batch, items)
+
+    assert len(retry_calls) == 1
+    assert retry_calls[0]["args"] == (items[1:],)
+    assert len(smtp_connections) == 1
+    assert smtp_connections[0].quit_calls == 1
+
+
+@pytest.fixture
+def enqueued_groups(monkeypatch):
+    """Capture the Celery groups built by enqueue_emails instead of publishing them."""
+    groups = []
+
+    class FakeGroup:
+        def __init__(self, signatures):
+            self.signatures = list(signatures)
+            self.applied = False
+            groups.append(self)
+
+        def apply_async(self):
+            self.applied = True
+
+    monkeypatch.setattr(account_tasks, "group", FakeGroup)
+    return groups
+
+
+def test_enqueue_emails_chunks_by_batch_size(enqueued_groups):
+    recipients = [f"user{i}@example.com" for i in range(23)]
+
+    enqueue_emails([("activation", recipient, "http://test/activate") for recipient in recipients])
+
+    assert len(enqueued_groups) == 1
+    assert enqueued_groups[0].applied
+    chunks = [signature.args[0] for signature in enqueued_groups[0].signatures]
+    assert [len(chunk) for chunk in chunks] == [EMAIL_BATCH_SIZE, EMAIL_BATCH_SIZE, 3]
+    assert [item["recipient"] for chunk in chunks for item in chunk] == recipients
+
+
+def test_enqueue_emails_with_no_items_does_nothing(enqueued_groups):
+    enqueue_emails([])
+
+    assert enqueued_groups == []